@@ -60,6 +60,12 @@ Always be respectful, honest about your limitations, and focus on being genuinel
     frequencyPenalty: 0.1,
     presencePenalty: 0.1,
   },
+
+  responseCache: {
+    enabled: process.env.RESPONSE_CACHE_ENABLED !== 'false',
+    maxEntries: parseInt(process.env.RESPONSE_CACHE_MAX_ENTRIES) || 4096,
+    ttlMs: parseInt(process.env.RESPONSE_CACHE_TTL_MS) || 10 * 60 * 1000,
+  },
 };
 
 module.exports = {
@@ -17,6 +17,28 @@ const chatLimiter = rateLimit({
 // Apply rate limiting to all chat routes
 router.use(chatLimiter);
 
+// Longest message excerpt written to the log per request
+const LOG_PREVIEW_LENGTH = 200;
+
+// Shorten a message for logging; stdout writes are synchronous for files
+// and pipes, so logging whole payloads would stall the event loop
+const previewMessage = (message) => {
+  // Describe non-string payloads by shape rather than serializing them
+  if (typeof message !== 'string') {
+    if (Array.isArray(message)) {
+      return `[array with ${message.length} items]`;
+    }
+    if (message !== null && typeof message === 'object') {
+      return `[object with ${Object.keys(message).length} keys]`;
+    }
+    return `[${typeof message}]`;
+  }
+
+  return message.length > LOG_PREVIEW_LENGTH
+    ? `${message.slice(0, LOG_PREVIEW_LENGTH)}... (${message.length} chars)`
+    : message;
+};
+
 // POST /api/chat - Send a message to the AI agent
 router.post('/chat', async (req, res) => {
   try {
@@ -29,7 +51,7 @@ router.post('/chat', async (req, res) => {
       });
     }
 
-    console.log(`Processing message from session ${sessionId || 'new'}:`, message);
+    console.log(`Processing message from session ${sessionId || 'new'}:`, previewMessage(message));
     
     const result = await aiAgent.processMessage(message, sessionId, model);
     
@@ -44,6 +66,53 @@ router.post('/chat', async (req, res) => {
   }
 });
 
+// POST /api/chat/stream - Stream the AI response as Server-Sent Events
+router.post('/chat/stream', async (req, res) => {
+  const { message, sessionId, model } = req.body;
+  
+  if (!message || typeof message !== 'string') {
+    return res.status(400).json({
+      success: false,
+      error: 'Message is required and must be a string'
+    });
+  }
+
+  console.log(`Streaming message from session ${sessionId || 'new'}:`, previewMessage(message));
+
+  res.set({
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  res.flushHeaders();
+
+  // Stop generating as soon as the client disconnects
+  const abortController = new AbortController();
+  res.on('close', () => {
+    if (!res.writableEnded) {
+      abortController.abort();
+    }
+  });
+
+  try {
+    for await (const event of aiAgent.streamMessage(message, sessionId, model, abortController.signal)) {
+      res.write(`data: ${JSON.stringify(event)}\n\n`);
+    }
+  } catch (error) {
+    if (!abortController.signal.aborted) {
+      console.error('Error in chat stream endpoint:', error);
+      res.write(`data: ${JSON.stringify({
+        type: 'error',
+        error: 'Internal server error. Please try again.',
+        timestamp: new Date().toISOString()
+      })}\n\n`);
+    }
+  }
+
+  res.end();
+});
+
 // GET /api/chat/models - Get available AI models
 router.get('/chat/models', (req, res) => {
   try {
@@ -124,6 +193,25 @@ router.get('/chat/stats/:sessionId', (req, res) => {
   }
 });
 
+// GET /api/chat/cache - Get response cache statistics
+router.get('/chat/cache', (req, res) => {
+  try {
+    const cache = aiAgent.getCacheStats();
+    
+    res.json({
+      success: true,
+      cache,
+      timestamp: new Date().toISOString()
+    });
+  } catch (error) {
+    console.error('Error getting cache stats:', error);
+    res.status(500).json({
+      success: false,
+      error: 'Failed to retrieve cache statistics'
+    });
+  }
+});
+
 // Webhook endpoint for external integrations (n8n, etc.)
 router.post('/webhook', async (req, res) => {
   try {
@@ -136,7 +224,7 @@ router.post('/webhook', async (req, res) => {
       });
     }
 
-    console.log(`Processing webhook message from session ${sessionId || 'webhook'}:`, message);
+    console.log(`Processing webhook message from session ${sessionId || 'webhook'}:`, previewMessage(message));
     
     const result = await aiAgent.processMessage(message, sessionId, model);
     
@@ -1,10 +1,31 @@
 const { openai, agentConfig, availableModels } = require('../config/ai');
+const crypto = require('crypto');
 const { v4: uuidv4 } = require('uuid');
+const ResponseCache = require('./responseCache');
+
+// System prompt message, shared by every request
+const SYSTEM_MESSAGE = Object.freeze({
+  role: 'system',
+  content: agentConfig.systemPrompt,
+});
+
+// Default fallback responses when no keyword matches
+const DEFAULT_FALLBACK_RESPONSES = [
+  "I understand you're asking about that. Let me help you with that.",
+  "That's an interesting question. Here's what I can tell you about that.",
+  "I can help you with that. Let me provide some information.",
+  "Thanks for your message. I'm here to assist you with that.",
+  "I appreciate your question. Let me address that for you."
+];
 
 class AIAgent {
   constructor() {
     this.conversations = new Map();
     this.model = agentConfig.responseSettings;
+    this.pendingResponses = new Map();
+    this.responseCache = agentConfig.responseCache.enabled
+      ? new ResponseCache(agentConfig.responseCache)
+      : null;
   }
 
   // Create a new conversation session
@@ -64,29 +85,61 @@ class AIAgent {
 
   // Process user message and generate AI response
   async processMessage(message, sessionId, modelName = null) {
+    let turn = null;
+
     try {
-      // Add user message to conversation
-      this.addMessage(sessionId, 'user', message);
-      
-      // Get conversation context
-      const session = this.getSession(sessionId);
-      const messages = this.buildMessageHistory(session);
-      
-      // Generate AI response
-      const response = await this.generateResponse(messages, modelName);
+      turn = this.beginTurn(message, sessionId, modelName);
+
+      // Join an identical request already in flight for this session rather
+      // than answering, and recording, the same turn twice. If that request
+      // fails (e.g. its streaming client disconnected), answer this one here
+      let inFlight = this.getInFlight(turn);
+      while (inFlight) {
+        let content;
+        try {
+          ({ content } = await inFlight);
+        } catch (error) {
+          inFlight = this.getInFlight(turn);
+          continue;
+        }
+
+        return {
+          success: true,
+          response: content,
+          ...this.buildTurnMetadata(turn, false),
+        };
+      }
+
+      // Add user message to conversation and check for a cached reply
+      const cached = this.recordUserTurn(turn, message);
+      if (cached !== undefined) {
+        this.finishTurn(turn, cached, false);
+        return {
+          success: true,
+          response: cached,
+          ...this.buildTurnMetadata(turn, true),
+        };
+      }
+
+      // Generate AI response, letting concurrent duplicates share it
+      const messages = this.buildMessageHistory(turn.session);
+      const pending = this.generateResponse(messages, modelName);
+      this.trackPending(turn.requestKey, pending);
+      const { content: response, fromModel } = await pending;
       
       // Add AI response to conversation
-      this.addMessage(sessionId, 'assistant', response);
+      this.finishTurn(turn, response, fromModel);
       
       return {
         success: true,
         response,
-        sessionId,
-        timestamp: new Date().toISOString(),
-        model: modelName || 'default',
+        ...this.buildTurnMetadata(turn, false),
       };
     } catch (error) {
       console.error('Error processing message:', error);
+      if (turn) {
+        this.abandonTurn(turn);
+      }
       return {
         success: false,
         response: "I'm sorry, I encountered an error processing your request. Please try again.",
@@ -96,46 +149,262 @@ class AIAgent {
     }
   }
 
+  // Process user message and stream the AI response as it is generated
+  // Yields { type: 'token', token } events followed by one { type: 'done' } event
+  async *streamMessage(message, sessionId, modelName = null, signal = undefined) {
+    const turn = this.beginTurn(message, sessionId, modelName);
+
+    let inFlight = this.getInFlight(turn);
+    while (inFlight) {
+      let content;
+      try {
+        ({ content } = await inFlight);
+      } catch (error) {
+        inFlight = this.getInFlight(turn);
+        continue;
+      }
+
+      yield { type: 'token', token: content };
+      yield { type: 'done', ...this.buildTurnMetadata(turn, false) };
+      return;
+    }
+
+    const cached = this.recordUserTurn(turn, message);
+    if (cached !== undefined) {
+      this.finishTurn(turn, cached, false);
+      yield { type: 'token', token: cached };
+      yield { type: 'done', ...this.buildTurnMetadata(turn, true) };
+      return;
+    }
+
+    // Let concurrent duplicates wait for this stream's final reply
+    let settle;
+    const pending = new Promise((resolve, reject) => {
+      settle = { resolve, reject };
+    });
+    this.trackPending(turn.requestKey, pending);
+
+    const messages = this.buildMessageHistory(turn.session);
+    let response = '';
+    let fromModel = false;
+    let streamOpened = false;
+    let completed = false;
+
+    try {
+      if (openai) {
+        try {
+          const stream = await openai.chat.completions.create(
+            this.buildCompletionParams(messages, modelName, true),
+            { signal }
+          );
+          streamOpened = true;
+
+          for await (const chunk of stream) {
+            // OpenRouter reports failures after the stream has started in-band
+            const choice = chunk.choices?.[0];
+            if (chunk.error || choice?.finish_reason === 'error') {
+              throw new Error(chunk.error?.message || 'Completion stream reported an error');
+            }
+
+            const token = choice?.delta?.content;
+            if (token) {
+              response += token;
+              yield { type: 'token', token };
+            }
+          }
+
+          // An empty completion is a failure, not a reply to record or cache
+          if (!response) {
+            throw new Error('Completion stream returned no content');
+          }
+          fromModel = true;
+        } catch (error) {
+          // Fall back only when the request itself failed; once the model has
+          // started streaming, its errors are surfaced rather than papered over
+          if (streamOpened || signal?.aborted) {
+            throw error;
+          }
+          console.error('OpenRouter API error:', error);
+        }
+      }
+
+      if (!fromModel) {
+        response = this.generateFallbackResponse(message);
+        yield { type: 'token', token: response };
+      }
+
+      this.finishTurn(turn, response, fromModel);
+      settle.resolve({ content: response, fromModel });
+      completed = true;
+    } finally {
+      // An aborted or failed stream leaves no dangling user turn behind
+      if (!completed) {
+        this.abandonTurn(turn);
+        // Unregister before rejecting so waiting duplicates generate their own
+        // reply instead of rejoining this one
+        this.untrackPending(turn.requestKey, pending);
+        settle.reject(new Error('Response stream did not complete'));
+      }
+    }
+
+    yield { type: 'done', ...this.buildTurnMetadata(turn, false) };
+  }
+
+  // Resolve the session and request identity for a new turn
+  beginTurn(message, sessionId, modelName) {
+    // Resolve the session up front so a missing sessionId maps to one session
+    const session = this.getSession(sessionId);
+
+    return {
+      session,
+      sessionId: session.id,
+      modelName,
+      requestKey: this.buildRequestKey(session.id, modelName, message),
+      cacheKey: null,
+      userMessage: null,
+    };
+  }
+
+  // Add the user message for a turn and return a cached reply if one exists
+  recordUserTurn(turn, message) {
+    // Key the cache on the conversation before this turn
+    turn.cacheKey = this.buildCacheKey(turn.session, turn.modelName, message);
+    turn.userMessage = this.addMessage(turn.sessionId, 'user', message);
+
+    return turn.cacheKey ? this.responseCache.get(turn.cacheKey) : undefined;
+  }
+
+  // Add the assistant reply for a turn, caching it when it came from the model
+  finishTurn(turn, response, cacheable) {
+    this.addMessage(turn.sessionId, 'assistant', response);
+
+    // Only cache real model output, never canned fallback replies
+    if (cacheable && turn.cacheKey) {
+      this.responseCache.set(turn.cacheKey, response);
+    }
+  }
+
+  // Remove a turn's user message when no reply will be recorded for it
+  abandonTurn(turn) {
+    const index = turn.session.messages.indexOf(turn.userMessage);
+    if (index !== -1) {
+      turn.session.messages.splice(index, 1);
+    }
+  }
+
+  // Response fields shared by the blocking and streaming chat paths
+  buildTurnMetadata(turn, cached) {
+    return {
+      sessionId: turn.sessionId,
+      timestamp: new Date().toISOString(),
+      model: turn.modelName || 'default',
+      cached,
+    };
+  }
+
+  // Identify a request within a session so concurrent duplicates can share
+  // one upstream call, or null when it can't be shared
+  buildRequestKey(sessionId, modelName, message) {
+    if (typeof message !== 'string') {
+      return null;
+    }
+
+    return `${sessionId}\u0000${modelName || 'default'}\u0000${ResponseCache.normalize(message)}`;
+  }
+
+  // Register an in-flight response under its request key until it settles
+  trackPending(requestKey, pending) {
+    if (!requestKey) {
+      return;
+    }
+
+    this.pendingResponses.set(requestKey, pending);
+    pending
+      .catch(() => {})
+      .finally(() => this.untrackPending(requestKey, pending));
+  }
+
+  // Unregister an in-flight response unless another has replaced it
+  untrackPending(requestKey, pending) {
+    if (requestKey && this.pendingResponses.get(requestKey) === pending) {
+      this.pendingResponses.delete(requestKey);
+    }
+  }
+
+  // Get the in-flight response an identical request in this session can join
+  getInFlight(turn) {
+    return turn.requestKey ? this.pendingResponses.get(turn.requestKey) : undefined;
+  }
+
+  // Build the response cache key for a turn, or null when it can't be cached
+  // The key covers the history the model will see rather than the session, so
+  // identical conversations share replies (e.g. the same opening question in
+  // new sessions) while follow-ups like "another one" stay context-specific
+  buildCacheKey(session, modelName, message) {
+    if (!this.responseCache || typeof message !== 'string') {
+      return null;
+    }
+
+    const context = crypto
+      .createHash('sha1')
+      .update(JSON.stringify(session.messages.map(({ role, content }) => [role, content])))
+      .digest('hex');
+
+    return ResponseCache.buildKey(modelName || 'default', context, message);
+  }
+
   // Build message history for API call
   buildMessageHistory(session) {
-    const messages = [
-      {
-        role: 'system',
-        content: agentConfig.systemPrompt,
-      },
-    ];
+    const messages = [SYSTEM_MESSAGE];
     
-    // Add conversation history
-    messages.push(...session.messages);
+    // Add conversation history, sending only the fields the API reads
+    for (const { role, content } of session.messages) {
+      messages.push({ role, content });
+    }
     
     return messages;
   }
 
+  // Build chat completion request parameters
+  buildCompletionParams(messages, modelName, stream) {
+    return {
+      model: modelName || process.env.DEFAULT_MODEL || 'deepseek/deepseek-r1-0528:free',
+      messages: messages,
+      max_tokens: this.model.maxTokens,
+      temperature: this.model.temperature,
+      top_p: this.model.topP,
+      frequency_penalty: this.model.frequencyPenalty,
+      presence_penalty: this.model.presencePenalty,
+      stream,
+    };
+  }
+
   // Generate response using OpenRouter or fallback
+  // Resolves to { content, fromModel } so callers can tell fallback replies apart
   async generateResponse(messages, modelName = null) {
     // Check if OpenRouter is available
     if (!openai) {
-      return this.generateFallbackResponse(messages[messages.length - 1]?.content || '');
+      return {
+        content: this.generateFallbackResponse(messages[messages.length - 1]?.content || ''),
+        fromModel: false,
+      };
     }
 
-    const model = modelName || process.env.DEFAULT_MODEL || 'deepseek/deepseek-r1-0528:free';
-    
     try {
-      const completion = await openai.chat.completions.create({
-        model: model,
-        messages: messages,
-        max_tokens: this.model.maxTokens,
-        temperature: this.model.temperature,
-        top_p: this.model.topP,
-        frequency_penalty: this.model.frequencyPenalty,
-        presence_penalty: this.model.presencePenalty,
-        stream: false,
-      });
-
-      return completion.choices[0].message.content;
+      const completion = await openai.chat.completions.create(
+        this.buildCompletionParams(messages, modelName, false)
+      );
+
+      return {
+        content: completion.choices[0].message.content,
+        fromModel: true,
+      };
     } catch (error) {
       console.error('OpenRouter API error:', error);
-      return this.generateFallbackResponse(messages[messages.length - 1]?.content || '');
+      return {
+        content: this.generateFallbackResponse(messages[messages.length - 1]?.content || ''),
+        fromModel: false,
+      };
     }
   }
 
@@ -156,16 +425,7 @@ class AIAgent {
       return "I can help you with programming questions! What programming language or framework are you working with?";
     }
 
-    // Default responses
-    const responses = [
-      "I understand you're asking about that. Let me help you with that.",
-      "That's an interesting question. Here's what I can tell you about that.",
-      "I can help you with that. Let me provide some information.",
-      "Thanks for your message. I'm here to assist you with that.",
-      "I appreciate your question. Let me address that for you."
-    ];
-
-    return responses[Math.floor(Math.random() * responses.length)];
+    return DEFAULT_FALLBACK_RESPONSES[Math.floor(Math.random() * DEFAULT_FALLBACK_RESPONSES.length)];
   }
 
   // Get available models
@@ -188,6 +448,18 @@ class AIAgent {
     }
   }
 
+  // Get response cache stats
+  getCacheStats() {
+    if (!this.responseCache) {
+      return { enabled: false };
+    }
+
+    return {
+      enabled: true,
+      ...this.responseCache.getStats(),
+    };
+  }
+
   // Get conversation stats
   getConversationStats(sessionId) {
     const session = this.getSession(sessionId);
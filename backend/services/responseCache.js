@@ -0,0 +1,75 @@
+// In-memory LRU cache for AI responses with TTL expiry.
+// Map iteration order is insertion order, so the first key is always the
+// least recently used entry once reads re-insert what they touch.
+class ResponseCache {
+  constructor({ maxEntries = 4096, ttlMs = 10 * 60 * 1000 } = {}) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.entries = new Map();
+    this.hits = 0;
+    this.misses = 0;
+  }
+
+  // Reduce a message to a canonical form so messages that only differ in
+  // case or spacing share an entry
+  static normalize(message) {
+    return message
+      .toLowerCase()
+      .replace(/\s+/g, ' ')
+      .trim();
+  }
+
+  // Build a cache key from the model, conversation context and message
+  static buildKey(model, context, message) {
+    return `${model}\u0000${context}\u0000${ResponseCache.normalize(message)}`;
+  }
+
+  // Get a cached value, refreshing its LRU position
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.misses++;
+      return undefined;
+    }
+
+    if (Date.now() - entry.createdAt > this.ttlMs) {
+      this.entries.delete(key);
+      this.misses++;
+      return undefined;
+    }
+
+    this.hits++;
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  // Store a value, evicting the least recently used entries when full
+  set(key, value) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, createdAt: Date.now() });
+
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value;
+      this.entries.delete(oldestKey);
+    }
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+
+  // Get cache usage counters
+  getStats() {
+    return {
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: this.hits + this.misses > 0 ? this.hits / (this.hits + this.misses) : 0,
+    };
+  }
+}
+
+module.exports = ResponseCache;
@@ -12,6 +12,7 @@ function App() {
   ]);
   const [inputMessage, setInputMessage] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [streamingMessageId, setStreamingMessageId] = useState(null);
   const [sessionId, setSessionId] = useState(null);
   const messagesEndRef = useRef(null);
 
@@ -43,8 +44,31 @@ function App() {
     setInputMessage('');
     setIsLoading(true);
 
+    const botMessageId = Date.now() + 1;
+
+    // Create the bot message on the first token, then grow it in place
+    const updateBotMessage = (text, model) => {
+      setMessages(prev => {
+        if (!prev.some(message => message.id === botMessageId)) {
+          return [...prev, {
+            id: botMessageId,
+            text,
+            sender: 'bot',
+            timestamp: new Date(),
+            model
+          }];
+        }
+
+        return prev.map(message =>
+          message.id === botMessageId ? { ...message, text, model } : message
+        );
+      });
+    };
+
+    let reader = null;
+
     try {
-      const response = await fetch('http://localhost:5001/api/chat', {
+      const response = await fetch('http://localhost:5001/api/chat/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -60,26 +84,62 @@ function App() {
         throw new Error(`HTTP ${response.status}: ${errorText}`);
       }
 
-      const data = await response.json();
-      
-      if (data.success) {
-        const botMessage = {
-          id: Date.now() + 1,
-          text: data.response,
-          sender: 'bot',
-          timestamp: new Date(),
-          model: data.model
-        };
-
-        setMessages(prev => [...prev, botMessage]);
-      } else {
-        throw new Error(data.error || 'Failed to get response');
+      reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let text = '';
+      let receivedDone = false;
+
+      const handleEvent = (event) => {
+        if (!event.startsWith('data: ')) return;
+
+        const data = JSON.parse(event.slice('data: '.length));
+
+        if (data.type === 'token') {
+          text += data.token;
+          setStreamingMessageId(botMessageId);
+          updateBotMessage(text);
+        } else if (data.type === 'done') {
+          receivedDone = true;
+          updateBotMessage(text, data.model);
+        } else if (data.type === 'error') {
+          throw new Error(data.error || 'Failed to get response');
+        }
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        // Server-Sent Events are separated by a blank line
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+
+        events.forEach(handleEvent);
+      }
+
+      // Handle a final event that arrived without a trailing blank line
+      buffer += decoder.decode();
+      if (buffer.trim()) {
+        handleEvent(buffer.trim());
+      }
+
+      // A stream cut off before its done event holds an incomplete reply
+      if (!receivedDone) {
+        throw new Error('The response stream ended unexpectedly');
       }
     } catch (error) {
       console.error('Error sending message:', error);
+
+      // Close a stream we've given up on so the server aborts that turn,
+      // rather than leaving it running while the input is re-enabled
+      if (reader) {
+        await reader.cancel().catch(() => {});
+      }
       
       const errorMessage = {
-        id: Date.now() + 1,
+        id: botMessageId + 1,
         text: `Error: ${error.message}. Please check your connection and try again.`,
         sender: 'bot',
         timestamp: new Date()
@@ -88,6 +148,7 @@ function App() {
       setMessages(prev => [...prev, errorMessage]);
     } finally {
       setIsLoading(false);
+      setStreamingMessageId(null);
     }
   };
 
@@ -161,7 +222,7 @@ function App() {
               </div>
             </div>
           ))}
-          {isLoading && (
+          {isLoading && !streamingMessageId && (
             <div className="loading-message">
               <div className="typing-indicator">
                 <span></span>